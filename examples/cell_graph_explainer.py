@@ -20,6 +20,10 @@ from histocartography.ml import CellGraphModel
 from histocartography.interpretability import GraphGradCAMExplainer
 from histocartography.visualization import OverlayGraphVisualization, InstanceImageVisualization
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 IS_CUDA = torch.cuda.is_available()
 DEVICE = 'cuda:0' if IS_CUDA else 'cpu'
@@ -33,7 +37,10 @@ def explain_cell_graphs(cell_graph_path, image_path):
 
     # 1. get cell graph & image paths
     cg_fnames = glob(os.path.join(cell_graph_path, '*.bin'))
-    image_fnames = glob(os.path.join(image_path, '*.png'))
+    image_fnames = {
+        os.path.splitext(os.path.basename(x))[0]: x
+        for x in glob(os.path.join(image_path, '*.png'))
+    }
 
     # 2. create model
     config_fname = os.path.join(
@@ -41,7 +48,7 @@ def explain_cell_graphs(cell_graph_path, image_path):
         'config',
         'cg_bracs_cggnn_3_classes_gin.yml')
     with open(config_fname, 'r') as file:
-        config = yaml.load(file)
+        config = yaml.load(file, Loader=SafeLoader)
 
     model = CellGraphModel(
         gnn_params=config['gnn_params'],
@@ -71,9 +78,7 @@ def explain_cell_graphs(cell_graph_path, image_path):
         graph = set_graph_on_cuda(graph)
 
         # b. load corresponding image
-        image_path = [
-            x for x in image_fnames if graph_name in x.replace(
-                '.png', '.bin')][0]
+        image_path = image_fnames[os.path.splitext(graph_name)[0]]
         _, image_name = os.path.split(image_path)
         image = np.array(Image.open(image_path))
 
@@ -8,6 +8,7 @@ import torch
 import os
 
 from ..pipeline import PipelineStep
+from ..utils.torch import get_device
 
 
 class BaseExplainer(PipelineStep):
@@ -29,7 +30,7 @@ class BaseExplainer(PipelineStep):
 
         # look for GPU
         self.cuda = torch.cuda.is_available()
-        self.device = torch.device("cuda:0" if self.cuda else "cpu")
+        self.device = get_device()
 
         # set model
         self.model = model
@@ -108,7 +108,6 @@ class BaseCAM(object):
 
         # Get map weight
         weights = self._get_weights(class_idx, scores)
-        is_cuda = weights.is_cuda
 
         # Perform the weighted combination to get the CAM
         forwards = torch.stack(self.forward_hook, dim=2)
@@ -117,8 +116,7 @@ class BaseCAM(object):
             weights.unsqueeze(0).repeat(num_nodes, 1, 1) * forwards.squeeze(0)
         ).sum(dim=1)
 
-        if is_cuda:
-            batch_cams = batch_cams.cuda()
+        batch_cams = batch_cams.to(weights.device)
 
         if self._relu:
             batch_cams = F.relu(batch_cams, inplace=True)
@@ -1,8 +1,8 @@
 from tqdm import tqdm
 from copy import deepcopy
+from functools import partial
 import dgl
 import math
-from scipy.stats import entropy
 import os
 import torch
 import torch.nn as nn
@@ -16,7 +16,6 @@ from ..utils.torch import torch_to_numpy
 from ..utils import is_box_url, download_box_link
 
 
-DEVICE = 'cuda:0' if torch.cuda.is_available() else 'cpu'
 MODEL_MODULE = 'histocartography.ml'
 
 
@@ -32,6 +31,7 @@ class GraphPruningExplainer(BaseExplainer):
         num_epochs: int = 500,
         lr: float = 0.01,
         weight_decay: float = 5e-4,
+        mixed_precision: bool = False,
         **kwargs
     ) -> None:
         """
@@ -54,6 +54,8 @@ class GraphPruningExplainer(BaseExplainer):
                               Default to 500.
             lr (float): Learning rate. Default to 0.01.
             weight_decay (float): Weight decay. Default to 5e-4.
+            mixed_precision (bool): If the mask is trained with automatic mixed
+                                    precision. Only used on GPU. Default to False.
         """
 
         super(GraphPruningExplainer, self).__init__(**kwargs)
@@ -62,6 +64,8 @@ class GraphPruningExplainer(BaseExplainer):
         # objects.
         self.model = self._convert_to_dense_gnn_model()
 
+        self.mixed_precision = mixed_precision and self.cuda
+
         self.node_thresh = node_thresh
         self.train_params = {
             'num_epochs': num_epochs,
@@ -140,8 +144,10 @@ class GraphPruningExplainer(BaseExplainer):
         adj = torch.tensor(sub_adj, dtype=torch.float).to(self.device)
         x = torch.tensor(sub_feat, dtype=torch.float).to(self.device)
 
-        init_logits = self.model(graph)
-        init_logits = init_logits.cpu().detach()
+        # reference prediction runs at the same precision as the mask training
+        with torch.cuda.amp.autocast(enabled=self.mixed_precision):
+            init_logits = self.model(graph)
+        init_logits = init_logits.float().cpu().detach()
         init_probs = torch.nn.Softmax()(init_logits)
         init_pred_label = torch.argmax(init_logits, dim=1).squeeze()
 
@@ -156,14 +162,14 @@ class GraphPruningExplainer(BaseExplainer):
 
         self.node_feats_explanation = x
         self.probs_explanation = init_probs
-        self.node_importance = torch_to_numpy(explainer._get_node_feats_mask())
+        self.node_importance = explainer._get_node_feats_mask().detach()
 
         self.model.eval()
         explainer.train()
 
         # Init training stats
-        init_probs = init_probs.numpy().squeeze()
         loss = torch.FloatTensor([10000.])
+        scaler = torch.cuda.amp.GradScaler(enabled=self.mixed_precision)
 
         # log description
         desc = self._set_pbar_desc()
@@ -174,31 +180,36 @@ class GraphPruningExplainer(BaseExplainer):
             unit='step')
 
         for _ in pbar:
-            logits, masked_feats = explainer()
-            loss = explainer.loss(logits)
+            explainer.zero_grad(set_to_none=True)
+            with torch.cuda.amp.autocast(enabled=self.mixed_precision):
+                logits, masked_feats = explainer()
+                loss = explainer.loss(logits)
+            logits = logits.float()
 
             # Compute number of non zero elements in the masked adjacency
             node_importance = explainer._get_node_feats_mask()
             node_importance[node_importance < self.node_thresh] = 0.
             masked_feats = masked_feats * \
                 torch.stack(masked_feats.shape[-1] * [node_importance], dim=1).unsqueeze(dim=0).to(torch.float)
-            probs = torch.nn.Softmax()(logits.cpu().squeeze()).detach().numpy()
+            probs = torch.softmax(logits.squeeze(), dim=0).detach()
             pred_label = torch.argmax(logits, dim=0).squeeze()
 
             # handle early stopping if the labels is changed
             if pred_label.item() == init_pred_label:
                 self.node_feats_explanation = masked_feats
                 self.probs_explanation = probs
-                self.node_importance = torch_to_numpy(node_importance)
+                self.node_importance = node_importance.detach()
             else:
                 print('Predicted label changed. Early stopping.')
                 break
 
-            explainer.zero_grad()
-            explainer.optimizer.zero_grad()
-            loss.backward(retain_graph=True)
-            explainer.optimizer.step()
+            scaler.scale(loss).backward()
+            scaler.step(explainer.optimizer)
+            scaler.update()
 
+        # move the explanation to the host once, not at every step
+        self.probs_explanation = torch_to_numpy(self.probs_explanation)
+        self.node_importance = torch_to_numpy(self.node_importance)
         node_importance = self.node_importance
         logits = init_logits.cpu().detach().numpy()
 
@@ -236,7 +247,7 @@ class ExplainerModel(nn.Module):
         super(ExplainerModel, self).__init__()
 
         # set data & model
-        self.device = DEVICE
+        self.device = adj.device
         self.adj = adj
         self.x = x
         self.model = model.to(self.device)
@@ -245,6 +256,7 @@ class ExplainerModel(nn.Module):
 
         # set model parameters
         self.mask_act = model_params['mask_activation']
+        self._set_mask_activations()
         init_strategy = model_params['init']
         self.mask_bias = None
         self.use_sigmoid = use_sigmoid
@@ -315,14 +327,20 @@ class ExplainerModel(nn.Module):
             nn.init.constant_(node_mask, const_val)
         return node_mask
 
-    def _get_adj_mask(self, with_zeroing=False):
+    def _set_mask_activations(self):
+        # resolve the mask activations once instead of at every step
         if self.mask_act == "sigmoid":
-            sym_mask = self.sigmoid(self.mask, t=2)
+            self.adj_mask_act = partial(self.sigmoid, t=2)
+            self.node_mask_act = partial(self.sigmoid, t=10)
         elif self.mask_act == "relu":
-            sym_mask = nn.ReLU()(self.mask)
+            self.adj_mask_act = F.relu
+            self.node_mask_act = F.relu
         else:
             raise ValueError('Unsupported mask activation {}. Options'
                              'are "sigmoid", "ReLU"'.format(self.mask_act))
+
+    def _get_adj_mask(self, with_zeroing=False):
+        sym_mask = self.adj_mask_act(self.mask)
         sym_mask = (sym_mask + sym_mask.t()) / 2
         if with_zeroing:
             sym_mask = (
@@ -344,14 +362,7 @@ class ExplainerModel(nn.Module):
         return masked_adj
 
     def _get_node_feats_mask(self):
-        if self.mask_act == "sigmoid":
-            node_mask = self.sigmoid(self.node_mask, t=10)
-        elif self.mask_act == "relu":
-            node_mask = nn.ReLU()(self.node_mask)
-        else:
-            raise ValueError('Unsupported mask activation {}. Options'
-                             'are "sigmoid", "ReLU"'.format(self.mask_act))
-        return node_mask
+        return self.node_mask_act(self.node_mask)
 
     @staticmethod
     def sigmoid(x, t=1):
@@ -372,14 +383,6 @@ class ExplainerModel(nn.Module):
         ypred = self.model(graph)
         return ypred, masked_x
 
-    def distillation_loss(self, inner_logits):
-        """
-        Compute distillation loss.
-        """
-        log_output = nn.LogSoftmax(dim=1)(inner_logits)
-        cross_entropy = self.init_probs * log_output
-        return -torch.mean(torch.sum(cross_entropy, dim=1))
-
     def loss(self, pred: torch.tensor):
         """
         Compute new overall loss given current prediction.
@@ -387,14 +390,19 @@ class ExplainerModel(nn.Module):
             pred (torch.tensor): Prediction made by current model.
         """
 
-        # 1. cross-entropy + distillation loss
-        ce_loss = F.cross_entropy(pred.unsqueeze(dim=0), self.label)
-        distillation_loss = self.distillation_loss(pred.unsqueeze(dim=0))
-        alpha = torch.FloatTensor([entropy(torch.nn.Softmax()(pred).cpu().detach(
-        ).numpy())]) / torch.log(torch.FloatTensor([self.init_probs.shape[1]]))
-        alpha = alpha.to(self.device)
-        pred_loss = self.coeffs['ce'] * \
-            (alpha * ce_loss + (1 - alpha) * distillation_loss)
+        # 1. cross-entropy + distillation loss. Both terms are cross-entropies
+        # on the same log-probabilities, so they are fused into a single one
+        # against the alpha-weighted mix of the label and the initial probs.
+        num_classes = self.init_probs.shape[1]
+        log_output = F.log_softmax(pred.unsqueeze(dim=0).float(), dim=1)
+        # normalized entropy of the prediction, computed on device to avoid
+        # a host sync at every step
+        probs = torch.exp(log_output.detach())
+        alpha = -torch.sum(torch.xlogy(probs, probs)) / math.log(num_classes)
+        target = alpha * F.one_hot(self.label, num_classes) + \
+            (1 - alpha) * self.init_probs
+        pred_loss = -self.coeffs['ce'] * \
+            torch.mean(torch.sum(target * log_output, dim=1))
 
         # 2. node loss
         node_mask = self._get_node_feats_mask()
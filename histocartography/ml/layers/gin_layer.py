@@ -5,7 +5,6 @@ Original paper:
     - How Powerful are Graph Neural Networks: https://arxiv.org/abs/1810.00826
     - Author's public implementation: https://github.com/weihua916/powerful-gnns
 """
-import itertools
 import numpy as np
 import torch
 import torch.nn as nn
@@ -129,8 +128,9 @@ class GINLayer(nn.Module):
         # apply graph norm and batch norm
         h = g.ndata[GNN_NODE_FEAT_OUT]
         if self.graph_norm:
-            snorm_n = torch.FloatTensor(list(itertools.chain(
-                *[[torch.sqrt(1 / n)] * n for n in g.batch_num_nodes()]))).to(h.get_device())
+            num_nodes = g.batch_num_nodes().to(h.device)
+            snorm_n = torch.repeat_interleave(
+                torch.sqrt(1. / num_nodes.float()), num_nodes)
             h = h * snorm_n[:, None]
         if self.batch_norm:
             h = self.batchnorm_h(h)
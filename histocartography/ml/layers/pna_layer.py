@@ -4,7 +4,6 @@
     https://arxiv.org/abs/2004.05718
 """
 
-import itertools
 import math
 import numpy as np
 import dgl
@@ -206,10 +205,11 @@ class PNATower(nn.Module):
         # graph and batch normalization
         if self.graph_norm:
             if hasattr(g, 'batch_num_nodes'):
-                num_nodes = g.batch_num_nodes()
+                num_nodes = g.batch_num_nodes().to(h.device)
             else:
-                num_nodes = [g.number_of_nodes()]
-            snorm_n = torch.FloatTensor(list(itertools.chain(*[[torch.sqrt(1 / n)] * n for n in num_nodes]))).to(h.device)
+                num_nodes = torch.tensor([g.number_of_nodes()], device=h.device)
+            snorm_n = torch.repeat_interleave(
+                torch.sqrt(1. / num_nodes.float()), num_nodes)
             h = h * snorm_n[:, None]
         if self.batch_norm:
             h = self.batchnorm_h(h)
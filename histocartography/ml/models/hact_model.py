@@ -169,15 +169,11 @@ class HACTModel(BaseModel):
         Use the assignment matrix to agg the feats
         """
         num_nodes_per_graph = graph.batch_num_nodes().tolist()
-        num_nodes_per_graph.insert(0, 0)
-        intervals = [sum(num_nodes_per_graph[:i + 1])
-                     for i in range(len(num_nodes_per_graph))]
+        feats_per_graph = torch.split(feats, num_nodes_per_graph)
 
         ll_h_concat = []
-        for i in range(1, len(intervals)):
-            h_agg = torch.matmul(
-                assignment[i - 1], feats[intervals[i - 1]:intervals[i], :]
-            )
+        for graph_assignment, graph_feats in zip(assignment, feats_per_graph):
+            h_agg = torch.matmul(graph_assignment, graph_feats)
             ll_h_concat.append(h_agg)
 
         return torch.cat(ll_h_concat, dim=0)
@@ -16,6 +16,7 @@ import torch
 import torchvision
 from histocartography.preprocessing.tissue_mask import GaussianTissueMask
 from histocartography.utils import dynamic_import_from
+from histocartography.utils.torch import enable_cudnn_benchmark, get_device
 from scipy.stats import skew
 from skimage.feature import graycomatrix, graycoprops
 from skimage.filters.rank import entropy as Entropy
@@ -326,7 +327,8 @@ class PatchFeatureExtractor:
         architecture: str,
         device: torch.device,
         patch_size: int,
-        extraction_layer: Optional[str] = None
+        extraction_layer: Optional[str] = None,
+        cudnn_benchmark: bool = False,
     ) -> None:
         """
         Create a patch feature extracter of a given architecture and put it on GPU if available.
@@ -336,8 +338,16 @@ class PatchFeatureExtractor:
             device (torch.device): Torch Device.
             patch_size (int): Desired size of patch.
             extraction_layer (Optional[str]): Name of the network module from where the features are extracted.
+            cudnn_benchmark (bool): Let cuDNN autotune its kernels for the fixed patch size. Changes
+                                    the process-wide cuDNN setting. Defaults to False.
         """
         self.device = device
+        self.memory_format = torch.contiguous_format
+        if self.device.type == "cuda":
+            if cudnn_benchmark:
+                enable_cudnn_benchmark()
+            # NHWC layout avoids layout transposes in cuDNN convolutions
+            self.memory_format = torch.channels_last
 
         if architecture.startswith("s3://mlflow"):
             model = self._get_mlflow_model(url=architecture)
@@ -349,6 +359,7 @@ class PatchFeatureExtractor:
         self._validate_model(model)
         self.model = self._remove_layers(model, extraction_layer)
         self.num_features = self._get_num_features(model, patch_size)
+        self.model = self.model.to(memory_format=self.memory_format)
         self.model.eval()
 
     @staticmethod
@@ -469,7 +480,8 @@ class PatchFeatureExtractor:
         Returns:
             torch.Tensor: Embedding of image.
         """
-        patch = patch.to(self.device)
+        patch = patch.to(
+            self.device, non_blocking=True, memory_format=self.memory_format)
         with torch.no_grad():
             embeddings = self.model(patch).squeeze()
         return embeddings
@@ -701,6 +713,7 @@ class DeepFeatureExtractor(FeatureExtractor):
         verbose: bool = False,
         with_instance_masking: bool = False,
         extraction_layer: str = None,
+        cudnn_benchmark: bool = False,
         **kwargs,
     ) -> None:
         """
@@ -720,6 +733,8 @@ class DeepFeatureExtractor(FeatureExtractor):
             num_workers (int): Number of workers in data loader. Defaults to 0.
             verbose (bool): tqdm processing bar. Defaults to False.
             with_instance_masking (bool): If pixels outside instance should be masked. Defaults to False.
+            cudnn_benchmark (bool): Let cuDNN autotune its kernels for the fixed patch size. Changes
+                                    the process-wide cuDNN setting. Defaults to False.
         """
         self.architecture = self._preprocess_architecture(architecture)
         self.patch_size = patch_size
@@ -738,8 +753,7 @@ class DeepFeatureExtractor(FeatureExtractor):
         super().__init__(**kwargs)
 
         # Handle GPU
-        cuda = torch.cuda.is_available()
-        self.device = torch.device("cuda:0" if cuda else "cpu")
+        self.device = get_device()
 
         if normalizer is not None:
             self.normalizer_mean = normalizer.get("mean", [0, 0, 0])
@@ -748,7 +762,11 @@ class DeepFeatureExtractor(FeatureExtractor):
             self.normalizer_mean = [0.485, 0.456, 0.406]
             self.normalizer_std = [0.229, 0.224, 0.225]
         self.patch_feature_extractor = PatchFeatureExtractor(
-            architecture, device=self.device, patch_size=patch_size, extraction_layer=extraction_layer
+            architecture,
+            device=self.device,
+            patch_size=patch_size,
+            extraction_layer=extraction_layer,
+            cudnn_benchmark=cudnn_benchmark,
         )
         self.fill_value = fill_value
         self.batch_size = batch_size
@@ -757,9 +775,10 @@ class DeepFeatureExtractor(FeatureExtractor):
         if self.num_workers in [0, 1]:
             torch.set_num_threads(1)
 
-    def _collate_patches(self, batch):
+    @staticmethod
+    def _collate_patches(batch):
         """Patch collate function"""
-        instance_indices = [item[0] for item in batch]
+        instance_indices = torch.as_tensor([item[0] for item in batch])
         patches = [item[1] for item in batch]
         patches = torch.stack(patches)
         return instance_indices, patches
@@ -801,10 +820,10 @@ class DeepFeatureExtractor(FeatureExtractor):
             image_dataset,
             shuffle=False,
             batch_size=self.batch_size,
-            num_workers=self.num_workers,
-            collate_fn=self._collate_patches
+            collate_fn=self._collate_patches,
+            **_get_loader_kwargs(self.num_workers, self.device)
         )
-        features = torch.empty(
+        features = torch.zeros(
             size=(
                 len(image_dataset.properties),
                 self.patch_feature_extractor.num_features,
@@ -812,21 +831,21 @@ class DeepFeatureExtractor(FeatureExtractor):
             dtype=torch.float32,
             device=self.device,
         )
-        embeddings = dict()
+        nr_patches = torch.zeros(
+            len(image_dataset.properties),
+            dtype=torch.float32,
+            device=self.device,
+        )
         for instance_indices, patches in tqdm(
             image_loader, total=len(image_loader), disable=not self.verbose
         ):
             emb = self.patch_feature_extractor(patches)
-            for j, key in enumerate(instance_indices):
-                if key in embeddings:
-                    embeddings[key][0] += emb[j]
-                    embeddings[key][1] += 1
-                else:
-                    embeddings[key] = [emb[j], 1]
-
-        for k, v in embeddings.items():
-            features[k, :] = v[0] / v[1]
+            instance_indices = instance_indices.to(self.device, non_blocking=True)
+            # sum the patch embeddings of each instance
+            features.index_add_(0, instance_indices, emb.reshape(len(instance_indices), -1))
+            nr_patches.index_add_(0, instance_indices, torch.ones(len(instance_indices), device=self.device))
 
+        features = features / nr_patches.clamp(min=1).unsqueeze(dim=1)
         return features.cpu().detach()
 
 
@@ -1027,6 +1046,7 @@ class GridDeepFeatureExtractor(FeatureExtractor):
         num_workers: int = 0,
         verbose: bool = False,
         extraction_layer: str = None,
+        cudnn_benchmark: bool = False,
         **kwargs,
     ) -> None:
         """
@@ -1045,6 +1065,8 @@ class GridDeepFeatureExtractor(FeatureExtractor):
             fill_value (int): Constant pixel value for image padding. Defaults to 255.
             num_workers (int): Number of workers in data loader. Defaults to 0.
             verbose (bool): tqdm processing bar. Defaults to False.
+            cudnn_benchmark (bool): Let cuDNN autotune its kernels for the fixed patch size. Changes
+                                    the process-wide cuDNN setting. Defaults to False.
         """
         self.architecture = self._preprocess_architecture(architecture)
         self.patch_size = patch_size
@@ -1066,8 +1088,7 @@ class GridDeepFeatureExtractor(FeatureExtractor):
             self.verbose = verbose
 
         # Handle GPU
-        cuda = torch.cuda.is_available()
-        self.device = torch.device("cuda:0" if cuda else "cpu")
+        self.device = get_device()
 
         if normalizer is not None:
             self.normalizer_mean = normalizer.get("mean", [0, 0, 0])
@@ -1076,7 +1097,11 @@ class GridDeepFeatureExtractor(FeatureExtractor):
             self.normalizer_mean = [0.485, 0.456, 0.406]
             self.normalizer_std = [0.229, 0.224, 0.225]
         self.patch_feature_extractor = PatchFeatureExtractor(
-            architecture, device=self.device, patch_size=patch_size, extraction_layer=extraction_layer
+            architecture,
+            device=self.device,
+            patch_size=patch_size,
+            extraction_layer=extraction_layer,
+            cudnn_benchmark=cudnn_benchmark,
         )
         self.batch_size = batch_size
         self.fill_value = fill_value
@@ -1085,9 +1110,10 @@ class GridDeepFeatureExtractor(FeatureExtractor):
         if self.num_workers in [0, 1]:
             torch.set_num_threads(1)
 
-    def _collate_patches(self, batch):
+    @staticmethod
+    def _collate_patches(batch):
         """Patch collate function"""
-        indices = [item[0] for item in batch]
+        indices = torch.as_tensor([item[0] for item in batch])
         patches = [item[1] for item in batch]
         patches = torch.stack(patches)
         return indices, patches
@@ -1126,8 +1152,8 @@ class GridDeepFeatureExtractor(FeatureExtractor):
             patch_dataset,
             shuffle=False,
             batch_size=self.batch_size,
-            num_workers=self.num_workers,
-            collate_fn=self._collate_patches
+            collate_fn=self._collate_patches,
+            **_get_loader_kwargs(self.num_workers, self.device)
         )
         features = torch.empty(
             size=(
@@ -1210,7 +1236,8 @@ class MaskedGridDeepFeatureExtractor(GridDeepFeatureExtractor):
         super().__init__(**kwargs)
         self.tissue_thresh = tissue_thresh
 
-    def _collate_patches(self, batch):
+    @staticmethod
+    def _collate_patches(batch):
         """Patch collate function"""
         indices = [item[0] for item in batch]
         patches = [item[1] for item in batch]
@@ -1253,8 +1280,8 @@ class MaskedGridDeepFeatureExtractor(GridDeepFeatureExtractor):
         patch_loader = DataLoader(masked_patch_dataset,
                                   shuffle=False,
                                   batch_size=self.batch_size,
-                                  num_workers=self.num_workers,
-                                  collate_fn=self._collate_patches)
+                                  collate_fn=self._collate_patches,
+                                  **_get_loader_kwargs(self.num_workers, self.device))
 
         # create dictionaries where the keys are the patch indices
         all_index_filter = OrderedDict(
@@ -1272,9 +1299,10 @@ class MaskedGridDeepFeatureExtractor(GridDeepFeatureExtractor):
             index_filter, features = self._validate_and_extract_features(img_patches, mask_patches)
             if len(img_patches) == 1:
                 features = features.unsqueeze(dim=0)
+            features = features.cpu().detach().numpy()
             for i in range(len(index_filter)):
                 all_index_filter[indices[offset+i]] = index_filter[i]
-                all_features[indices[offset+i]] = features[i].cpu().detach().numpy()
+                all_features[indices[offset+i]] = features[i]
             offset += len(index_filter)
 
         # convert to pandas dataframes to allow storing as .h5 files
@@ -1383,6 +1411,26 @@ def _remove_modules(model: nn.Module, last_layer: str) -> nn.Module:
         setattr(model, mod, nn.Sequential())
     return model
 
+def _get_loader_kwargs(num_workers: int, device: torch.device) -> dict:
+    """Returns the keyword arguments of a patch DataLoader for a given number of workers and device.
+       Worker processes keep several batches ready so that the model does not wait on patch extraction.
+       Workers are not made persistent since a patch loader is only iterated once per image.
+
+    Args:
+        num_workers (int): Number of workers in the data loader
+        device (torch.device): Device the patches are sent to
+
+    Returns:
+        dict: DataLoader keyword arguments
+    """
+    kwargs = {
+        "num_workers": num_workers,
+        "pin_memory": device.type == "cuda",
+    }
+    if num_workers > 0:
+        kwargs["prefetch_factor"] = 4
+    return kwargs
+
 def _get_pad_size(size: int, patch_size: int, stride: int) -> Tuple[int, int]:
     """Computes the necessary top and bottom padding size to evenly devide an input size into patches with a given stride
 
@@ -27,6 +27,7 @@ from tqdm import tqdm
 from ..pipeline import PipelineStep
 from ..utils.image import extract_patches_from_image
 from ..utils import download_box_link
+from ..utils.torch import enable_cudnn_benchmark, get_device
 
 DATASET_TO_BOX_URL = {
     "pannuke": "https://ibm.box.com/shared/static/hrt04i3dcv1ph1veoz8x6g8a72u0uw58.pt",
@@ -47,6 +48,8 @@ class NucleiExtractor(PipelineStep):
         pretrained_data: str = "pannuke",
         model_path: str = None,
         batch_size: int = None,
+        num_workers: int = 0,
+        cudnn_benchmark: bool = False,
         **kwargs,
     ) -> None:
         """Create a nuclei extractor
@@ -55,18 +58,24 @@ class NucleiExtractor(PipelineStep):
             pretrained_data (str): Load checkpoint pretrained on some data. Options are 'pannuke' or 'monusac'. Default to 'pannuke'.
             model_path (str): Path to a pre-trained model. If none, the checkpoint specified in pretrained_data will be used. Default to None.
             batch_size (int, optional): Batch size. Defaults to None.
+            num_workers (int, optional): Number of workers in data loader. Defaults to 0.
+            cudnn_benchmark (bool, optional): Let cuDNN autotune its kernels for the fixed patch size. Changes
+                                              the process-wide cuDNN setting. Defaults to False.
         """
         self.pretrained_data = pretrained_data
         super().__init__(**kwargs)
 
         # set class attributes
         cuda = torch.cuda.is_available()
-        self.device = torch.device("cuda:0" if cuda else "cpu")
+        self.device = get_device()
+        if cuda and cudnn_benchmark:
+            enable_cudnn_benchmark()
         if batch_size is None:
             # bs set to 16 if GPU, otherwise 2.
             self.batch_size = GPU_DEFAULT_BATCH_SIZE if cuda else CPU_DEFAULT_BATCH_SIZE
         else:
             self.batch_size = batch_size
+        self.num_workers = num_workers
 
         if model_path is None:
             assert pretrained_data in [
@@ -120,16 +129,13 @@ class NucleiExtractor(PipelineStep):
 
         image_dataset = ImageToPatchDataset(input_image)
 
-        def collate(batch):
-            coords = [x[0] for x in batch]
-            patches = torch.stack([x[1] for x in batch])
-            return coords, patches
-
         image_loader = DataLoader(
             image_dataset,
             shuffle=False,
             batch_size=self.batch_size,
-            collate_fn=collate)
+            num_workers=self.num_workers,
+            pin_memory=self.device.type == "cuda",
+            collate_fn=_collate_patches)
         pred_map = torch.empty(
             size=(image_dataset.max_x_coord, image_dataset.max_y_coord, 3),
             dtype=torch.float32,
@@ -139,9 +145,9 @@ class NucleiExtractor(PipelineStep):
         for coords, image_batch in tqdm(
             image_loader, desc="Patch-level nuclei detection"
         ):
-            image_batch = image_batch.to(self.device)
+            image_batch = image_batch.to(self.device, non_blocking=True)
             with torch.no_grad():
-                out = self.model(image_batch).cpu()
+                out = self.model(image_batch)
                 for i in range(out.shape[0]):
                     left = coords[i][0]  # left, bottom, right, top
                     bottom = coords[i][1]
@@ -183,6 +189,14 @@ class NucleiExtractor(PipelineStep):
             self._link_to_path(Path(link_path) / "nuclei_maps")
 
 
+def _collate_patches(batch):
+    """Patch collate function. Defined at module level so that it can be
+       pickled and run inside the data loader workers."""
+    coords = [x[0] for x in batch]
+    patches = torch.stack([x[1] for x in batch])
+    return coords, patches
+
+
 class ImageToPatchDataset(Dataset):
     """Helper class to transform an image as a set of patched wrapped in a pytorch dataset"""
 
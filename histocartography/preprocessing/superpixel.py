@@ -257,26 +257,10 @@ class MergedSuperpixelExtractor(SuperpixelExtractor):
             np.array: Output merged superpixel tensor
         """
         if tissue_mask is not None:
-            # Remove superpixels belonging to background or having < 10% tissue
-            # content
-            ids_initial = np.unique(initial_superpixels, return_counts=True)
-            ids_masked = np.unique(
-                tissue_mask * initial_superpixels, return_counts=True
+            initial_superpixels = self._remove_background_superpixels(
+                initial_superpixels, tissue_mask
             )
 
-            ctr = 1
-            superpixels = np.zeros_like(initial_superpixels)
-            for i in range(len(ids_initial[0])):
-                id = ids_initial[0][i]
-                if id in ids_masked[0]:
-                    idx = np.where(id == ids_masked[0])[0]
-                    ratio = ids_masked[1][idx] / ids_initial[1][i]
-                    if ratio >= 0.1:
-                        superpixels[initial_superpixels == id] = ctr
-                        ctr += 1
-
-            initial_superpixels = superpixels
-
         # Merge superpixels within tissue region
         g = self._generate_graph(input_image, initial_superpixels)
         merged_superpixels = graph.merge_hierarchical(
@@ -294,6 +278,33 @@ class MergedSuperpixelExtractor(SuperpixelExtractor):
         merged_superpixels = merged_superpixels * mask
         return merged_superpixels
 
+    @staticmethod
+    def _remove_background_superpixels(
+        initial_superpixels: np.ndarray, tissue_mask: np.ndarray
+    ) -> np.ndarray:
+        """Remove superpixels belonging to background or having < 10% tissue content
+        Args:
+            initial_superpixels (np.array): Initial superpixels
+            tissue_mask (np.array): Tissue mask
+        Returns:
+            np.array: Kept superpixels, relabelled consecutively from 1
+        """
+        counts_initial = np.bincount(initial_superpixels.ravel())
+        counts_masked = np.bincount(
+            (tissue_mask * initial_superpixels).astype(int).ravel(),
+            minlength=len(counts_initial),
+        )[: len(counts_initial)]
+
+        # relabel the kept superpixels consecutively from 1, in one
+        # lookup instead of one full-image comparison per superpixel
+        ids = np.flatnonzero(counts_initial)
+        keep = ids[counts_masked[ids] / counts_initial[ids] >= 0.1]
+        new_ids = np.zeros(
+            len(counts_initial), dtype=initial_superpixels.dtype)
+        new_ids[keep] = np.arange(1, len(keep) + 1)
+
+        return new_ids[initial_superpixels]
+
     @abstractmethod
     def _generate_graph(
         self, input_image: np.ndarray, superpixels: np.ndarray
@@ -454,29 +465,33 @@ class ColorMergedSuperpixelExtractor(MergedSuperpixelExtractor):
                     "labels": [n],
                     "N": 0,
                     "x": np.array([0, 0, 0]),
-                    "y": np.array([0, 0, 0]),
+                    "y": np.empty((0, 3), dtype=int),
                     "r": np.array([]),
                     "g": np.array([]),
                     "b": np.array([]),
                 }
             )
 
-        for index in np.ndindex(superpixels.shape):
-            current = superpixels[index]
+        # group the pixels of each superpixel with a single sort instead of
+        # visiting every pixel in Python
+        labels = superpixels.ravel()
+        order = np.argsort(labels, kind="stable")
+        pixels = input_image.reshape(-1, input_image.shape[-1])[order].astype(int)
+        ids, starts, counts = np.unique(
+            labels[order], return_index=True, return_counts=True)
+        for current, start, count in zip(ids, starts, counts):
             if current == 0:
                 continue
-            g.nodes[current]["N"] += 1
-            g.nodes[current]["x"] += input_image[index]
-            g.nodes[current]["y"] = np.vstack(
-                (g.nodes[current]["y"], input_image[index])
-            )
+            current_pixels = pixels[start:start + count]
+            g.nodes[current]["N"] = int(count)
+            g.nodes[current]["x"] = current_pixels.sum(axis=0)
+            g.nodes[current]["y"] = current_pixels
 
         for n in g:
             g.nodes[n]["mean"] = g.nodes[n]["x"] / g.nodes[n]["N"]
             g.nodes[n]["mean"] = g.nodes[n]["mean"] / \
                 np.linalg.norm(g.nodes[n]["mean"])
 
-            g.nodes[n]["y"] = np.delete(g.nodes[n]["y"], 0, axis=0)
             g.nodes[n]["r"] = self._color_features_per_channel(
                 g.nodes[n]["y"][:, 0])
             g.nodes[n]["g"] = self._color_features_per_channel(
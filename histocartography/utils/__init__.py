@@ -1,4 +1,5 @@
 import importlib
+from functools import lru_cache
 from typing import Any, Iterable, Tuple
 
 from .io import download_example_data, download_test_data
@@ -15,8 +16,10 @@ __all__ = [
 ]
 
 
+@lru_cache(maxsize=None)
 def dynamic_import_from(source_file: str, class_name: str) -> Any:
-    """Do a from source_file import class_name dynamically
+    """Do a from source_file import class_name dynamically.
+    Resolved symbols are cached, so repeated lookups skip importlib.
 
     Args:
         source_file (str): Where to import from
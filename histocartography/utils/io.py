@@ -8,6 +8,10 @@ import io
 import pickle
 import csv
 import requests
+from functools import lru_cache
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def is_box_url(candidate):
@@ -43,7 +47,7 @@ def h5_to_tensor(h5_object, device):
     """
     Convert h5 object into torch tensor
     """
-    tensor = torch.from_numpy(np.array(h5_object[()])).to(device)
+    tensor = torch.from_numpy(np.asarray(h5_object[()])).to(device)
     return tensor
 
 
@@ -51,7 +55,7 @@ def h5_to_numpy(h5_object):
     """
     Convert h5 object into numpy array
     """
-    out = np.array(h5_object[()])
+    out = np.asarray(h5_object[()])
     return out
 
 
@@ -70,6 +74,19 @@ def write_json(path, data):
         json.dump(data, f, ensure_ascii=False, indent=4)
 
 
+@lru_cache(maxsize=1)
+def get_session():
+    """
+    Get a shared HTTP session, so that consecutive downloads reuse connections
+    """
+    return requests.Session()
+
+
+# forked workers (e.g. BatchPipelineRunner) must not reuse the parent's sockets
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=get_session.cache_clear)
+
+
 def download_box_link(url, out_fname='box.file'):
     out_dir = os.path.dirname(out_fname)
     check_for_dir(out_dir)
@@ -77,12 +94,11 @@ def download_box_link(url, out_fname='box.file'):
         print('File already downloaded.')
         return out_fname
 
-    r = requests.get(url, stream=True)
-
-    with open(out_fname, "wb") as large_file:
-        for chunk in r.iter_content(chunk_size=1024):
-            if chunk:
-                large_file.write(chunk)
+    with get_session().get(url, stream=True) as r:
+        with open(out_fname, "wb") as large_file:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    large_file.write(chunk)
     return out_fname
 
 
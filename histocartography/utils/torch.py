@@ -1,5 +1,26 @@
+import os
 import torch
 
 
 def torch_to_numpy(x):
     return x.cpu().detach().numpy()
+
+
+def get_device():
+    """
+    Get the device to run on. When launched with torchrun, each process
+    uses the GPU given by its LOCAL_RANK instead of all sharing cuda:0.
+    """
+    if not torch.cuda.is_available():
+        return torch.device("cpu")
+    local_rank = int(os.environ.get("LOCAL_RANK", 0))
+    return torch.device("cuda:{}".format(local_rank))
+
+
+def enable_cudnn_benchmark():
+    """
+    Let cuDNN autotune its convolution kernels, which pays off when the
+    input size is fixed. Note that this changes process-wide global state:
+    the setting also applies to every other model run in the same process.
+    """
+    torch.backends.cudnn.benchmark = True
@@ -3,13 +3,16 @@ import unittest
 import numpy as np
 import cv2
 import torch
+import torch.nn.functional as F
 import yaml
 from copy import deepcopy
 import os
 import shutil
 from dgl.data.utils import load_graphs
+from scipy.stats import entropy
 
 from histocartography.interpretability import GraphPruningExplainer
+from histocartography.interpretability.graph_pruning_explainer import ExplainerModel
 from histocartography.ml import CellGraphModel
 from histocartography.utils import set_graph_on_cuda, download_test_data
 
@@ -69,6 +72,57 @@ class GraphGNNExplainer(unittest.TestCase):
         self.assertIsInstance(logits, np.ndarray)
         self.assertEqual(graph.number_of_nodes(), importance_scores.shape[0])
 
+    def test_explainer_loss(self):
+        """
+        Test the fused explainer loss against the separate cross-entropy
+        and distillation terms.
+        """
+
+        # 1. build an explainer on a toy graph
+        num_nodes, num_classes = 4, 3
+        init_probs = torch.softmax(
+            torch.tensor([[1.0, 0.2, -0.5]]), dim=1)
+        coeffs = {'node_ent': 1.0, 'node': 0.05, 'ce': 10.0}
+        explainer = ExplainerModel(
+            model=torch.nn.Identity(),
+            adj=torch.ones(1, num_nodes, num_nodes),
+            x=torch.rand(1, num_nodes, 5),
+            init_probs=init_probs,
+            model_params={
+                'loss': coeffs,
+                'node_thresh': 0.05,
+                'init': 'normal',
+                'mask_activation': 'sigmoid'
+            },
+            train_params={'num_epochs': 1, 'lr': 0.01, 'weight_decay': 5e-4}
+        )
+
+        # 2. fused loss
+        pred = torch.tensor([0.5, -1.0, 2.0], requires_grad=True)
+        loss = explainer.loss(pred)
+        grad, = torch.autograd.grad(loss, pred)
+
+        # 3. reference: alpha-weighted cross-entropy and distillation terms
+        ref_pred = pred.detach().clone().requires_grad_(True)
+        alpha = float(entropy(torch.softmax(ref_pred, dim=0).detach().numpy())
+                      / np.log(num_classes))
+        ce_loss = F.cross_entropy(ref_pred.unsqueeze(dim=0), torch.tensor([0]))
+        log_output = F.log_softmax(ref_pred.unsqueeze(dim=0), dim=1)
+        distillation_loss = -torch.mean(
+            torch.sum(init_probs * log_output, dim=1))
+        node_mask = explainer._get_node_feats_mask()
+        node_ent = -node_mask * torch.log(node_mask) - \
+            (1 - node_mask) * torch.log(1 - node_mask)
+        ref_loss = coeffs['ce'] * (alpha * ce_loss + (1 - alpha) * distillation_loss) + \
+            coeffs['node'] * torch.sum(node_mask) + \
+            coeffs['node_ent'] * torch.mean(node_ent)
+        ref_grad, = torch.autograd.grad(ref_loss, ref_pred)
+
+        # 4. tests
+        self.assertEqual(explainer.label.item(), 0)
+        self.assertAlmostEqual(loss.item(), ref_loss.item(), places=5)
+        self.assertTrue(torch.allclose(grad, ref_grad, atol=1e-6))
+
     def tearDown(self):
         """Tear down the tests."""
 
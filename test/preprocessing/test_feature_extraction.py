@@ -8,6 +8,8 @@ import torch
 import shutil
 
 from histocartography import PipelineRunner
+from histocartography.preprocessing import DeepFeatureExtractor
+from histocartography.preprocessing.feature_extraction import InstanceMapPatchDataset
 from histocartography.utils import download_test_data
 
 
@@ -334,6 +336,46 @@ class FeatureExtractionTestCase(unittest.TestCase):
 
         self.assertTrue(np.array_equal(features, reload_features))
 
+    def test_deep_feature_extractor_patch_averaging(self):
+        """
+        Test that deep instance features are the mean of their patch embeddings.
+        """
+
+        # instance 1 spans several patches, instance 2 is too small to get any
+        image = np.random.RandomState(0).randint(
+            0, 256, size=(96, 96, 3)).astype(np.uint8)
+        instance_map = np.zeros((96, 96), dtype=np.int64)
+        instance_map[8:72, 8:72] = 1
+        instance_map[84:86, 84:86] = 2
+
+        extractor = DeepFeatureExtractor(
+            architecture='mobilenet_v2',
+            patch_size=32,
+            batch_size=2
+        )
+        features = extractor._extract_features(image, instance_map)
+
+        # reference: embed the patches of instance 1 and average them
+        dataset = InstanceMapPatchDataset(
+            image=image,
+            instance_map=instance_map,
+            patch_size=32,
+            stride=32,
+            resize_size=None,
+            fill_value=255,
+            mean=extractor.normalizer_mean,
+            std=extractor.normalizer_std,
+        )
+        patches = [patch for region_count, patch in dataset if region_count == 0]
+        self.assertGreater(len(patches), 1)
+        self.assertEqual(len(patches), len(dataset))
+        emb = extractor.patch_feature_extractor(torch.stack(patches)).cpu()
+
+        self.assertEqual(features.shape, (2, 1280))
+        self.assertTrue(torch.allclose(
+            features[0], emb.mean(dim=0), atol=1e-4))
+        self.assertTrue(torch.equal(features[1], torch.zeros(1280)))
+
     def tearDown(self):
         """Tear down the tests."""
 
@@ -7,6 +7,7 @@ import shutil
 import pandas as pd
 
 from histocartography import PipelineRunner, BatchPipelineRunner
+from histocartography.preprocessing import ColorMergedSuperpixelExtractor
 from histocartography.utils import download_test_data
 
 
@@ -130,6 +131,81 @@ class SuperpixelTestCase(unittest.TestCase):
 
         pipeline.run(metadata=metadata, cores=2)
 
+    def test_remove_background_superpixels(self):
+        """
+        Test the tissue mask filtering of the initial superpixels against a
+        per-superpixel reference loop.
+        """
+
+        # label 0 is background, 1 is full tissue, 2 has 1 tissue pixel
+        # out of 20 (< 10%), 3 has none and 4 has half.
+        initial_superpixels = np.repeat(np.arange(5), 20).reshape(10, 10)
+        tissue_mask = np.zeros((10, 10), dtype=np.uint8)
+        tissue_mask[0, :5] = 1
+        tissue_mask[2:4] = 1
+        tissue_mask[4, 0] = 1
+        tissue_mask[8] = 1
+
+        superpixels = ColorMergedSuperpixelExtractor._remove_background_superpixels(
+            initial_superpixels, tissue_mask)
+
+        # reference: relabel each kept superpixel one at a time
+        ids_initial = np.unique(initial_superpixels, return_counts=True)
+        ids_masked = np.unique(
+            tissue_mask * initial_superpixels, return_counts=True)
+        ctr = 1
+        expected = np.zeros_like(initial_superpixels)
+        for i in range(len(ids_initial[0])):
+            id = ids_initial[0][i]
+            if id in ids_masked[0]:
+                idx = np.where(id == ids_masked[0])[0]
+                ratio = ids_masked[1][idx] / ids_initial[1][i]
+                if ratio >= 0.1:
+                    expected[initial_superpixels == id] = ctr
+                    ctr += 1
+
+        self.assertTrue(np.array_equal(superpixels, expected))
+        self.assertEqual(set(np.unique(superpixels)), {0, 1, 2, 3})
+        self.assertTrue(np.all(superpixels[4:8] == 0))
+
+    def test_color_merged_superpixel_graph(self):
+        """
+        Test the per-superpixel color statistics of the merging graph against
+        a per-pixel reference loop.
+        """
+
+        superpixels = np.array([
+            [0, 0, 1, 1, 2, 2],
+            [0, 1, 1, 2, 2, 2],
+            [3, 3, 1, 4, 4, 2],
+            [3, 3, 4, 4, 4, 2],
+            [3, 3, 4, 4, 1, 1],
+            [0, 0, 4, 4, 1, 1],
+        ])
+        image = np.random.RandomState(0).randint(
+            1, 256, size=(6, 6, 3)).astype(np.uint8)
+
+        extractor = ColorMergedSuperpixelExtractor(nr_superpixels=4)
+        g = extractor._generate_graph(image, superpixels)
+
+        # reference: visit the pixels in raster order
+        expected = {}
+        for index in np.ndindex(superpixels.shape):
+            current = superpixels[index]
+            if current == 0:
+                continue
+            N, x, y = expected.get(
+                current, (0, np.array([0, 0, 0]), np.array([0, 0, 0])))
+            expected[current] = (
+                N + 1, x + image[index], np.vstack((y, image[index])))
+
+        self.assertEqual(sorted(g.nodes), [1, 2, 3, 4])
+        for n, (N, x, y) in expected.items():
+            self.assertEqual(g.nodes[n]["N"], N)
+            self.assertTrue(np.array_equal(g.nodes[n]["x"], x))
+            self.assertTrue(np.array_equal(
+                g.nodes[n]["y"], np.delete(y, 0, axis=0)))
+
     def tearDown(self):
         """Tear down the tests."""
 